@@ -6,6 +6,7 @@ A lightweight desktop download manager for Linux using GTK 3 + PyGObject.
 Features:
 - Add downloads by URL and choose save location
 - Parallel downloads
+- Segmented downloads (parallel HTTP Range requests per file)
 - Pause/Resume (server must support HTTP Range)
 - Shows progress, speed, and ETA
 - Start All / Pause All / Remove selected
@@ -32,9 +33,12 @@ import time
 import errno
 import queue
 import signal
-import shutil
+import socket
 import threading
 import json
+import functools
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_EXCEPTION
 from dataclasses import dataclass, field
 from typing import Optional, Deque
 from collections import deque
@@ -43,9 +47,8 @@ import urllib.parse
 
 import requests
 import urllib3
-
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import gi
 gi.require_version("Gtk", "4.0")
@@ -56,6 +59,9 @@ GObject.threads_init()
 
 # ------------------------- Utilities -------------------------
 
+# Both formatters are cached; callers quantize their inputs (whole KB, whole
+# seconds) so steady-state refreshes hit the cache.
+@functools.lru_cache(maxsize=512)
 def human_size(num_bytes: Optional[float]) -> str:
     if num_bytes is None:
         return "?"
@@ -69,6 +75,7 @@ def human_size(num_bytes: Optional[float]) -> str:
     return f"{num_bytes:.1f} {units[i]}"
 
 
+@functools.lru_cache(maxsize=512)
 def human_time(seconds: Optional[float]) -> str:
     if seconds is None or math.isinf(seconds) or seconds < 0:
         return "--"
@@ -83,18 +90,41 @@ def human_time(seconds: Optional[float]) -> str:
     return f"{s:d}s"
 
 
+@functools.lru_cache(maxsize=32)
+def expand_path(path: str) -> str:
+    """os.path.expanduser, cached: the same few configured paths are expanded on every dialog"""
+    return os.path.expanduser(path)
+
+
+@functools.lru_cache(maxsize=64)
+def guess_filename(url: str) -> str:
+    """Last path component of a URL, ignoring query and fragment"""
+    path = urllib.parse.unquote(urllib.parse.urlsplit(url).path)
+    return os.path.basename(path) or "download.bin"
+
+
+def release_page_cache(fd: int):
+    """Flush a finished file and drop its pages; it is not read back before the rename"""
+    if hasattr(os, "posix_fadvise"):
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
 # ------------------------- Configuration -------------------------
 
 class ConfigManager:
     def __init__(self, config_file="~/.config/download_manager.json"):
-        self.config_file = os.path.expanduser(config_file)
+        self.config_file = expand_path(config_file)
         self.config = self.load_config()
+        self._flush_id = 0
     
     def load_config(self):
         """Load configuration from file or return defaults"""
         default_config = {
-            "default_download_path": os.path.expanduser("~/Downloads"),
-            "max_concurrent_downloads": 3
+            "default_download_path": expand_path("~/Downloads"),
+            "max_concurrent_downloads": 3,
+            # Set to false only for servers with self-signed certificates
+            "verify_ssl": True
         }
         
         try:
@@ -110,24 +140,45 @@ class ConfigManager:
     
     def save_config(self):
         """Save configuration to file"""
+        if self._flush_id:
+            GLib.source_remove(self._flush_id)
+            self._flush_id = 0
+        tmp_file = self.config_file + ".tmp"
         try:
             os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            with open(self.config_file, 'w') as f:
+            with open(tmp_file, 'w') as f:
                 json.dump(self.config, f, indent=2)
+            # Readers see either the old file or the new one, never a partial write
+            os.replace(tmp_file, self.config_file)
         except IOError:
             pass
+
+    def _flush(self):
+        self._flush_id = 0
+        self.save_config()
+        return False
     
     def get(self, key, default=None):
         return self.config.get(key, default)
     
     def set(self, key, value):
         self.config[key] = value
-        self.save_config()
+        # Coalesce bursts of changes into a single write
+        if not self._flush_id:
+            self._flush_id = GLib.timeout_add(500, self._flush)
+
+    def flush(self):
+        """Write pending changes now"""
+        if self._flush_id:
+            self.save_config()
 
 
 # ------------------------- HTTP Server for Chrome Extension -------------------------
 
 class DownloadManagerHTTPHandler(BaseHTTPRequestHandler):
+    # Drop clients that stall mid-request instead of holding a pool thread
+    timeout = 10
+
     def __init__(self, app_instance, *args, **kwargs):
         self.app = app_instance
         super().__init__(*args, **kwargs)
@@ -155,10 +206,10 @@ class DownloadManagerHTTPHandler(BaseHTTPRequestHandler):
                 if url:
                     # Get default download path
                     default_path = self.app.config_manager.get("default_download_path", "~/Downloads")
-                    dest_path = os.path.join(os.path.expanduser(default_path), filename)
+                    dest_path = os.path.join(expand_path(default_path), filename)
                     
                     # Add download to the app
-                    GLib.idle_add(self.app.add_download, url, dest_path)
+                    self.app.queue_download(url, dest_path)
                     
                     self.send_response(200)
                     self.send_header('Content-type', 'application/json')
@@ -189,53 +240,137 @@ def create_http_handler(app_instance):
     return handler
 
 
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves requests concurrently on a small fixed thread pool"""
+
+    def __init__(self, *args, max_workers: int = 4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
 # ------------------------- Download Worker -------------------------
 
-@dataclass
+# Hard cap on worker threads; the adaptive slot count never grows past it
+MAX_CONCURRENT_DOWNLOADS = 8
+
+# Smoothing factor for the speed average: 2/(N+1) with N=25 samples (~5s @ 5Hz)
+_SPEED_ALPHA = 2 / 26
+
+# Read/write granularity for response bodies. Reads start at 64 KiB and adapt to
+# the measured speed: large blocks on fast links, small ones so slow links still
+# report progress and notice a pause promptly.
+CHUNK_SIZE = 1024 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+
+# Files below this are fetched over one connection; extra requests cost more than they win
+SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+
+# Process-wide source of DownloadItem ids; unique even for same-millisecond adds
+_id_counter = itertools.count(1)
+
+
+@dataclass(eq=False)
 class DownloadItem:
     url: str
     dest_path: str
     app_ref: 'DownloadManagerApp' = field(repr=False)
 
-    id: int = field(default_factory=lambda: int(time.time() * 1000))
+    id: int = field(default_factory=lambda: next(_id_counter))
     filename: str = field(init=False)
     status: str = field(default="Queued")
     total_size: Optional[int] = None
     downloaded: int = 0
     supports_range: bool = False
-
-    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+    num_segments: int = 4
+
+    _future: Optional[Future] = field(default=None, init=False, repr=False)
+    _queued: bool = field(default=False, init=False, repr=False)
+    # Set when the last run ended in an error; Start All retries these
+    _failed: bool = field(default=False, init=False, repr=False)
+    # (progress, status, speed, eta) as last written to the row
+    _last_ui: Optional[tuple] = field(default=None, init=False, repr=False)
+    # (key, text) of the last formatted speed (whole KiB/s) and ETA (whole seconds)
+    _speed_str: tuple = field(default=(-1, ""), init=False, repr=False)
+    _eta_str: tuple = field(default=(-1, ""), init=False, repr=False)
     _stop_event: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
-    _progress_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # [start, next_offset, end] per byte range while a segmented download is in flight
+    _segments: Optional[list] = field(default=None, init=False, repr=False)
+    # Responses opened by the current run, so shutdown can break a blocked read
+    _responses: set = field(default_factory=set, init=False, repr=False)
 
-    # For speed calculation
-    _speed_window: Deque = field(default_factory=lambda: deque(maxlen=50), init=False, repr=False)  # ~5s @ 10Hz
+    # For speed calculation: exponential moving average, seeded by the first sample
+    _speed_seeded: bool = field(default=False, init=False, repr=False)
     speed_bps: float = 0.0
     eta_seconds: Optional[float] = None
+    # What the UI was last asked to show, to skip repaints that change nothing visible
+    _last_pct_sent: int = field(default=-1, init=False, repr=False)
+    _last_speed_sent: float = field(default=0.0, init=False, repr=False)
+    _last_sent_time: float = field(default=0.0, init=False, repr=False)
 
     def __post_init__(self):
         self.filename = os.path.basename(self.dest_path)
 
     # ---- Public controls ----
     def start(self):
-        if self._thread and self._thread.is_alive():
+        if self.is_active():
             return
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._worker, name=f"dl-{self.id}", daemon=True)
-        self._thread.start()
+        self._failed = False
+        self.app_ref.schedule(self)
 
     def pause(self):
-        if self._thread and self._thread.is_alive():
+        if self.app_ref.unschedule(self):
+            # Never got a slot; nothing to stop
+            self.status = "Paused"
+            self.app_ref.mark_dirty(self)
+        elif self.is_active():
             self._stop_event.set()
             self.status = "Pausing..."
 
     def is_active(self) -> bool:
-        return self._thread is not None and self._thread.is_alive()
+        return self._queued or (self._future is not None and not self._future.done())
+
+    def is_retryable(self) -> bool:
+        """Whether Start All should (re)start this item"""
+        return self._failed or self.status in ("Queued", "Paused")
+
+    def abort_io(self):
+        """Shut down the sockets under this item's open responses"""
+        for r in list(self._responses):
+            try:
+                s = socket.socket(fileno=os.dup(r.raw.fileno()))
+            except (OSError, AttributeError, ValueError):
+                # Already closed and released
+                continue
+            try:
+                s.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            finally:
+                s.close()
 
     # ---- Internal logic ----
     def _worker(self):
         try:
-            GLib.idle_add(self._update_status, "Starting...")
+            self._update_status("Starting...")
+            # Samples from before a pause describe a different connection
+            self._speed_seeded = False
+            self._responses.clear()
             part_path = self.dest_path + ".part"
             # Ensure directory exists
             os.makedirs(os.path.dirname(self.dest_path) or ".", exist_ok=True)
@@ -248,137 +383,403 @@ class DownloadItem:
                 except OSError:
                     existing = 0
 
-            # HEAD request: learn size and range support
-            session = requests.Session()
-            # Configure adapters with simpler retry strategy
-            from requests.adapters import HTTPAdapter
-            
-            adapter = HTTPAdapter(max_retries=3)
-            session.mount('http://', adapter)
-            session.mount('https://', adapter)
-            
-            # Set headers for better compatibility
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            })
-            
-            try:
-                GLib.idle_add(self._update_status, "Checking file info...")
-                head = session.head(self.url, timeout=30, allow_redirects=True, verify=False)
-                self.supports_range = head.headers.get("Accept-Ranges", "").lower() == "bytes"
-                total_from_head = head.headers.get("Content-Length")
-                if total_from_head is not None:
-                    self.total_size = int(total_from_head)
-            except Exception as e:
-                # Not fatal; proceed to GET
-                GLib.idle_add(self._update_status, "Starting download...")
-                pass
-
-            # Prepare GET with Range if resuming
-            headers = {}
-            mode = "wb"
-            if existing > 0:
-                if self.supports_range:
-                    headers["Range"] = f"bytes={existing}-"
-                    mode = "ab"
-                    self.downloaded = existing
-                    GLib.idle_add(self._update_status, f"Resuming from {human_size(existing)}...")
+            # Shared session; never mutate its headers here, pass headers= per request
+            session = self.app_ref.session
+
+            # Resume an interrupted segmented download straight from its saved ranges
+            seg_path = part_path + ".segments"
+            if self._segments is None and self.num_segments > 1 and existing:
+                self._segments = self._load_segments(seg_path)
+            if self._segments is not None:
+                if not existing or existing != self.total_size:
+                    # The ranges describe a preallocated part that is gone or was
+                    # altered; reopening it would zero-fill the bytes they count as done
+                    self._discard_partial(part_path, seg_path)
+                    existing = 0
+                elif self._download_segmented(session, part_path, seg_path):
+                    return
                 else:
-                    # Cannot resume; restart
+                    # Server ignored the Range header; restart as a single stream
                     existing = 0
-                    self.downloaded = 0
-                    GLib.idle_add(self._update_status, "Cannot resume, restarting...")
 
-            GLib.idle_add(self._update_status, "Connecting...")
-            with session.get(self.url, stream=True, headers=headers, timeout=60, verify=False) as r:
+            # No HEAD probe: size and range support come from the GET itself. Asking
+            # for a range even from 0 reveals servers that serve 206 without
+            # advertising Accept-Ranges.
+            headers = {"Range": f"bytes={existing}-"}
+            mode = "wb"
+            if existing > 0:
+                mode = "ab"
+                self.downloaded = existing
+                self._update_status(f"Resuming from {human_size(existing)}...")
+
+            self._update_status("Connecting...")
+            # verify is passed per request: a session-level False loses to REQUESTS_CA_BUNDLE
+            with session.get(self.url, stream=True, headers=headers, timeout=60,
+                             verify=session.verify) as r:
+                self._responses.add(r)
+                if r.status_code == 416:
+                    total = r.headers.get("Content-Range", "").rpartition("/")[2]
+                    if not existing and total == "0":
+                        # Zero-length file: there is no byte to ask for
+                        open(part_path, "wb").close()
+                        self.total_size = self.downloaded = 0
+                        self._finish(part_path)
+                        return
+                    if existing:
+                        # The part is at least as long as the file, but its size alone
+                        # does not prove the bytes are all there; start over
+                        self._discard_partial(part_path, seg_path)
+                        self._update_status("Cannot resume, restarting...")
+                        # Hand the connection back before the new request needs one
+                        r.close()
+                        return self._worker()
                 r.raise_for_status()
 
-                # Update total size for resumed/unknown-length downloads
-                if self.total_size is None:
-                    cl = r.headers.get("Content-Length")
-                    if cl is not None:
-                        length = int(cl)
-                        if existing and self.supports_range and r.status_code == 206:
-                            # length is remaining; full size = existing + remaining
-                            self.total_size = existing + length
-                        else:
-                            self.total_size = length
+                self.supports_range = (r.status_code == 206
+                                       or r.headers.get("Accept-Ranges", "").lower() == "bytes")
+                if existing and r.status_code != 206:
+                    # Cannot resume; the body is the whole file, so restart
+                    existing = 0
+                    mode = "wb"
+                    self.downloaded = 0
+                    self._update_status("Cannot resume, restarting...")
+
+                # Identity was asked for, but some servers compress anyway. Their sizes
+                # and ranges count encoded bytes, so take one decoded stream from the start.
+                encoded = r.headers.get("Content-Encoding", "identity").lower() not in ("", "identity")
+                if encoded and existing:
+                    self._discard_partial(part_path, seg_path)
+                    self.num_segments = 1
+                    self._update_status("Cannot resume, restarting...")
+                    r.close()
+                    return self._worker()
+
+                # Content-Range ("bytes a-b/total") states the full size outright
+                cr = r.headers.get("Content-Range", "")
+                cl = r.headers.get("Content-Length")
+                if r.status_code == 206 and cr.rpartition("/")[2].isdigit():
+                    self.total_size = int(cr.rpartition("/")[2])
+                elif cl is not None:
+                    # On 206 the length is what remains; full size = existing + remaining
+                    self.total_size = int(cl) + existing
+                if encoded:
+                    # Decoded length is unknown, and ranges cannot be split
+                    self.total_size = None
+                    self.supports_range = False
+
+                # Fresh range-capable download: split it, reusing this response for the first range
+                if (not existing and self.supports_range and self.num_segments > 1
+                        and self.total_size and self.total_size > SEGMENT_MIN_SIZE):
+                    sz = self.total_size
+                    n = self.num_segments
+                    self._segments = [[i * sz // n, i * sz // n, ((i + 1) * sz // n) - 1] for i in range(n)]
+                    if self._download_segmented(session, part_path, seg_path, first=r):
+                        return
+                    # The probe response is spent; start over as a single stream
+                    r.close()
+                    return self._worker()
 
                 # Content-Length may still be None (chunked). Handle gracefully.
                 chunk_sz = 64 * 1024
                 last_ui = 0.0
-                start_time = time.time()
+                start_time = time.monotonic()
                 last_bytes = self.downloaded
                 last_time = start_time
 
                 self.status = "Downloading"
-                GLib.idle_add(self.app_ref.refresh_row, self)
+                self.app_ref.mark_dirty(self)
 
-                with open(part_path, mode) as f:
-                    for chunk in r.iter_content(chunk_size=chunk_sz):
+                flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if mode == "wb" else 0)
+                fd = os.open(part_path, flags, 0o644)
+                offset = existing
+                completed = False
+                try:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    # No preallocation here: the file size is the resume offset, and
+                    # it has to stay true even if the process dies mid-write
+                    unpublished = 0  # bytes written but not yet added to self.downloaded
+                    # Read the urllib3 response directly; iter_content's generator adds nothing here
+                    while True:
                         if self._stop_event.is_set():
+                            self.downloaded += unpublished
                             self.status = "Paused"
-                            GLib.idle_add(self.app_ref.refresh_row, self)
+                            self.app_ref.mark_dirty(self)
                             return
-                        if chunk:
-                            f.write(chunk)
-                            with self._progress_lock:
-                                self.downloaded += len(chunk)
-
-                        now = time.time()
+                        chunk = r.raw.read(chunk_sz, decode_content=encoded)
+                        if not chunk:
+                            break
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        unpublished += len(chunk)
+
+                        now = time.monotonic()
                         if now - last_ui >= 0.2:  # update UI ~5x/sec
+                            # Sole writer; the UI thread only reads, so no lock is needed
+                            self.downloaded += unpublished
+                            unpublished = 0
                             # speed calc over rolling window (~5s)
                             dt = now - last_time
                             if dt > 0:
-                                delta = self.downloaded - last_bytes
-                                inst_speed = delta / dt
-                                self._speed_window.append((now, inst_speed))
-                                # average
-                                cutoff = now - 5
-                                speeds = [s for t, s in self._speed_window if t >= cutoff]
-                                self.speed_bps = sum(speeds) / len(speeds) if speeds else 0.0
-
-                                if self.total_size:
-                                    remain = max(self.total_size - self.downloaded, 0)
-                                    self.eta_seconds = remain / self.speed_bps if self.speed_bps > 0 else None
-                                else:
-                                    self.eta_seconds = None
+                                self._record_speed(now, self.downloaded - last_bytes, dt)
 
                             last_time = now
                             last_bytes = self.downloaded
                             last_ui = now
-                            GLib.idle_add(self.app_ref.refresh_row, self)
-
-                # Completed
-                try:
-                    shutil.move(part_path, self.dest_path)
-                except Exception:
-                    # If move fails, keep part file
-                    pass
-                self.status = "Done"
-                self.speed_bps = 0.0
-                self.eta_seconds = 0.0
-                GLib.idle_add(self.app_ref.refresh_row, self)
-        except requests.exceptions.ConnectionError as e:
-            self.status = f"Connection error: Network unreachable"
-            GLib.idle_add(self.app_ref.refresh_row, self)
-        except requests.exceptions.Timeout as e:
-            self.status = f"Timeout error: Server took too long to respond"
-            GLib.idle_add(self.app_ref.refresh_row, self)
+                            self._publish_progress(now)
+                            chunk_sz = self._tune_chunk(chunk_sz)
+
+                    self.downloaded += unpublished
+                    if self._stop_event.is_set() and (self.total_size is None
+                                                      or offset < self.total_size):
+                        # Cut off by abort_io; without a length the EOF looks like the end
+                        self.status = "Paused"
+                        self.app_ref.mark_dirty(self)
+                        return
+                    completed = True
+                finally:
+                    try:
+                        if completed:
+                            release_page_cache(fd)
+                    except OSError:
+                        # fsync is where delayed write errors (ENOSPC, EIO) surface, and
+                        # the pages may be gone; fail rather than resume from them later
+                        self._discard_partial(part_path, seg_path)
+                        raise
+                    finally:
+                        os.close(fd)
+                self._finish(part_path)
+        except requests.exceptions.SSLError:
+            self._fail("TLS error: Certificate verification failed")
+        except (requests.exceptions.ConnectionError, urllib3.exceptions.ProtocolError) as e:
+            self._fail(f"Connection error: Network unreachable")
+        except (requests.exceptions.Timeout, urllib3.exceptions.ReadTimeoutError) as e:
+            self._fail(f"Timeout error: Server took too long to respond")
         except requests.exceptions.RequestException as e:
-            self.status = f"Request error: {str(e)}"
-            GLib.idle_add(self.app_ref.refresh_row, self)
+            self._fail(f"Request error: {str(e)}")
         except requests.HTTPError as e:
-            self.status = f"HTTP error: {e.response.status_code}"
-            GLib.idle_add(self.app_ref.refresh_row, self)
+            self._fail(f"HTTP error: {e.response.status_code}")
         except Exception as e:
-            self.status = f"Error: {str(e)}"
-            GLib.idle_add(self.app_ref.refresh_row, self)
+            self._fail(f"Error: {str(e)}")
+
+    def _download_segmented(self, session, part_path: str, seg_path: str, first=None) -> bool:
+        """Fetch the remaining byte ranges in parallel; False if the server ignores Range
+
+        ``first`` is an already-open response positioned at offset 0; it feeds the
+        first range so a fresh download needs no extra request.
+        """
+        self.downloaded = sum(pos - start for start, pos, _ in self._segments)
+        # Record the ranges before the file is preallocated, and refuse to go on
+        # without them: a full-size part with no sidecar cannot be resumed safely
+        self._save_segments(seg_path, strict=True)
+        abort = threading.Event()
+        futures = []
+        fd = os.open(part_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self.total_size:
+                try:
+                    os.posix_fallocate(fd, 0, self.total_size)
+                except (OSError, AttributeError):
+                    # Filesystem or platform without fallocate support
+                    os.ftruncate(fd, self.total_size)
+
+            self.status = "Downloading"
+            self.app_ref.mark_dirty(self)
+
+            pending = [seg for seg in self._segments if seg[1] <= seg[2]]
+            pool = self.app_ref.segment_pool
+            futures = [pool.submit(self._fetch_segment, session, fd, seg, abort,
+                                   first if seg[1] == 0 else None)
+                       for seg in pending]
+            last_bytes = self.downloaded
+            last_time = time.monotonic()
+            not_done = set(futures)
+            while not_done:
+                done, not_done = wait(not_done, timeout=0.2, return_when=FIRST_EXCEPTION)
+                # One failed or unranged segment stops its siblings
+                if any(not f.cancelled() and (f.exception() is not None or f.result() is False)
+                       for f in done):
+                    abort.set()
+
+                # Each segment advances only its own offset; summing them needs no lock
+                self.downloaded = sum(pos - start for start, pos, _ in self._segments)
+                now = time.monotonic()
+                dt = now - last_time
+                if dt > 0:
+                    self._record_speed(now, self.downloaded - last_bytes, dt)
+                last_time = now
+                last_bytes = self.downloaded
+                self._publish_progress(now)
+        finally:
+            # The pool is shared, so wait for our own ranges before closing the fd
+            if not all(f.done() for f in futures):
+                abort.set()
+            wait(futures)
+            try:
+                if all(pos > end for _, pos, end in self._segments):
+                    release_page_cache(fd)
+            except OSError:
+                # Same as the single stream: written ranges may not be on disk
+                self._discard_partial(part_path, seg_path)
+                raise
+            finally:
+                os.close(fd)
+        self.downloaded = sum(pos - start for start, pos, _ in self._segments)
+
+        # Ranges cancelled by a pool shutdown simply stay incomplete
+        finished = [f for f in futures if not f.cancelled()]
+        errors = [f.exception() for f in finished if f.exception() is not None]
+        if not errors and any(f.result() is False for f in finished):
+            # Never split this item again; the partial ranges are useless
+            self._discard_partial(part_path, seg_path)
+            self.num_segments = 1
+            return False
+        if errors or self._stop_event.is_set() or any(pos <= end for _, pos, end in self._segments):
+            self._save_segments(seg_path)
+            # A pause may have broken the sockets on purpose (abort_io)
+            if errors and not self._stop_event.is_set():
+                raise errors[0]
+            if not self._stop_event.is_set():
+                raise IOError("Connection closed before all segments completed")
+            self.status = "Paused"
+            self.speed_bps = 0.0
+            self.app_ref.mark_dirty(self)
+            return True
+
+        try:
+            os.remove(seg_path)
+        except OSError:
+            pass
+        self._segments = None
+        self._finish(part_path)
+        return True
+
+    def _discard_partial(self, part_path: str, seg_path: str):
+        """Delete the part file and its sidecar so the next attempt starts from zero"""
+        for path in (part_path, seg_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._segments = None
+        self.downloaded = 0
+
+    def _fetch_segment(self, session, fd: int, seg: list, abort: threading.Event, first=None) -> bool:
+        """Stream one byte range into the part file at its own offset"""
+        if self._stop_event.is_set() or abort.is_set():
+            # Stopped while still queued in the shared pool
+            if first is not None:
+                first.close()
+            return True
+        end = seg[2]
+        if first is None:
+            headers = {"Range": f"bytes={seg[1]}-{end}"}
+            first = session.get(self.url, stream=True, headers=headers, timeout=60,
+                                verify=session.verify)
+        with first as r:
+            self._responses.add(r)
+            r.raise_for_status()
+            # A 200 body starts at offset 0, which is only usable for the first range
+            if r.status_code != 206 and seg[1] != 0:
+                return False
+            # Encoded ranges cannot be stitched together; fall back to one stream
+            if r.headers.get("Content-Encoding", "identity").lower() not in ("", "identity"):
+                return False
+            chunk_sz = 64 * 1024
+            while seg[1] <= end:
+                if self._stop_event.is_set() or abort.is_set():
+                    break
+                chunk = r.raw.read(min(chunk_sz, end + 1 - seg[1]), decode_content=False)
+                if not chunk:
+                    break
+                # Each segment owns a disjoint range, so no seek lock is needed
+                chunk = chunk[:end + 1 - seg[1]]
+                os.pwrite(fd, chunk, seg[1])
+                seg[1] += len(chunk)
+                chunk_sz = self._tune_chunk(chunk_sz, len(self._segments))
+        return True
+
+    def _tune_chunk(self, chunk_sz: int, streams: int = 1) -> int:
+        """Double or halve the read size from this stream's share of the measured speed"""
+        if not self._speed_seeded:
+            return chunk_sz
+        speed = self.speed_bps / streams
+        if speed > 8 * 1024 * 1024 and chunk_sz < CHUNK_SIZE:
+            return chunk_sz * 2
+        if speed < 256 * 1024 and chunk_sz > MIN_CHUNK_SIZE:
+            return chunk_sz // 2
+        return chunk_sz
+
+    def _load_segments(self, seg_path: str) -> Optional[list]:
+        """Restore range progress saved by an interrupted segmented download"""
+        try:
+            with open(seg_path, 'r') as f:
+                state = json.load(f)
+            if self.total_size is None or state.get("total_size") == self.total_size:
+                self.total_size = state["total_size"]
+                return state["segments"]
+        except (json.JSONDecodeError, IOError, KeyError):
+            pass
+        return None
+
+    def _save_segments(self, seg_path: str, strict: bool = False):
+        """Write range progress atomically; with strict, a failed write raises"""
+        tmp_path = seg_path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({"total_size": self.total_size, "segments": self._segments}, f)
+            os.replace(tmp_path, seg_path)
+        except IOError:
+            if strict:
+                raise
+
+    def _record_speed(self, now: float, delta: int, dt: float):
+        """Fold a new sample into the moving speed average and refresh the ETA"""
+        inst_speed = delta / dt
+        if self._speed_seeded:
+            self.speed_bps += _SPEED_ALPHA * (inst_speed - self.speed_bps)
+        else:
+            self.speed_bps = inst_speed
+            self._speed_seeded = True
+
+        if self.total_size:
+            remain = max(self.total_size - self.downloaded, 0)
+            self.eta_seconds = remain / self.speed_bps if self.speed_bps > 0 else None
+        else:
+            self.eta_seconds = None
+
+    def _publish_progress(self, now: float):
+        """Request a repaint only when the percentage or speed visibly moved"""
+        pct = (100 * self.downloaded // self.total_size) if self.total_size else -1
+        speed_moved = abs(self.speed_bps - self._last_speed_sent) > 0.1 * self._last_speed_sent
+        # Still repaint once a second so the ETA keeps counting down
+        if pct != self._last_pct_sent or speed_moved or now - self._last_sent_time >= 1.0:
+            self._last_pct_sent = pct
+            self._last_speed_sent = self.speed_bps
+            self._last_sent_time = now
+            self.app_ref.mark_dirty(self)
+
+    def _finish(self, part_path: str):
+        try:
+            # .part sits next to dest_path, so this is a single atomic rename
+            os.replace(part_path, self.dest_path)
+        except OSError:
+            # If move fails, keep part file
+            pass
+        self.status = "Done"
+        self.speed_bps = 0.0
+        self.eta_seconds = 0.0
+        self.app_ref.mark_dirty(self)
+
+    def _fail(self, text: str):
+        self.status = text
+        self._failed = True
+        self.app_ref.mark_dirty(self)
 
     def _update_status(self, text: str):
+        # Transitions closer together than a UI tick share one repaint
         self.status = text
-        self.app_ref.refresh_row(self)
-        return False
+        self.app_ref.mark_dirty(self)
 
 
 # ------------------------- GTK App -------------------------
@@ -391,6 +792,8 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
     COL_ETA = 4
     COL_URL = 5
     COL_OBJ = 6
+    # Columns refresh_row may rewrite; filename and URL never change after append
+    LIVE_COLS = (COL_PROGRESS, COL_STATUS, COL_SPEED, COL_ETA)
 
     def __init__(self, app):
         super().__init__(application=app)
@@ -399,7 +802,31 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         
         # Initialize config manager
         self.config_manager = ConfigManager()
-        
+
+        # Shared HTTP session so downloads reuse pooled keep-alive connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64,
+                              max_retries=Retry(total=3, backoff_factor=0.3))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # TLS verification is configured once here; workers pass it on with each request
+        self.session.verify = bool(self.config_manager.get("verify_ssl", True))
+        if not self.session.verify:
+            # The user opted out; don't warn on every request
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        # Set headers for better compatibility
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # Store bytes as sent; byte ranges and resume offsets refer to the unencoded body
+            'Accept-Encoding': 'identity'
+        })
+
+        # Extension requests land here from server threads and are added in batches
+        self._ingress: list = []
+        self._ingress_lock = threading.Lock()
+        self._ingress_id = 0
+
         # Start HTTP server for Chrome extension
         self.start_http_server()
         
@@ -412,6 +839,35 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         # Create main content
         self.setup_main_content()
 
+        # Download slots: a bounded worker pool plus an adaptive slot count
+        self.pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="dl")
+        # Range fetches from every download share one capped pool, keeping
+        # the total thread count bounded however many items are queued
+        self.segment_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS * 4, thread_name_prefix="seg")
+        # The configured limit is a ceiling; tuning only moves the slot count below it
+        self._k_max = max(1, min(self.config_manager.get("max_concurrent_downloads", 3), MAX_CONCURRENT_DOWNLOADS))
+        self._k = self._k_max
+        self._pending: Deque[DownloadItem] = deque()
+        self._running: set = set()
+        self._sched_lock = threading.Lock()
+        # Throughput measured when the slot count last changed; later ticks are
+        # judged against it, so a slot that bought nothing is not added again
+        self._last_throughput = 0.0
+        self._last_per_slot = 0.0
+        self._tune_seen: frozenset = frozenset()
+
+        # Progress ticks only mark items dirty; one 5 Hz pump repaints them.
+        # Both timers are installed on demand so an idle app has no wakeups.
+        self._dirty: set = set()
+        self._dirty_lock = threading.Lock()
+        self._tune_id = 0
+        self._pump_id = 0
+        self._stats_dirty = False
+        # Tracked by the map/unmap handlers so worker threads never query GTK
+        self._mapped = False
+        self.connect("map", self._on_map)
+        self.connect("unmap", self._on_unmap)
+
     def setup_headerbar(self):
         # Headerbar
         hb = Gtk.HeaderBar()
@@ -533,6 +989,11 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
 
         # ListStore model
         self.store = Gtk.ListStore(str, int, str, str, str, str, object)
+        # item.id -> Gtk.TreeIter; ListStore iters stay valid until their row is removed
+        self._rows: dict = {}
+        # Nesting depth of freeze_view(), plus the selection/scroll to restore on thaw
+        self._frozen = 0
+        self._frozen_state = (None, 0.0)
 
         # TreeView with modern styling
         self.view = Gtk.TreeView(model=self.store)
@@ -540,14 +1001,19 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         self.view.connect("row-activated", self.on_row_activated)
         self.view.set_css_classes(["download-list"])
 
-        # Columns with modern styling
+        # Columns with modern styling. Every column is FIXED-width and every
+        # renderer is single-line, which lets fixed-height mode size rows
+        # from the first one instead of measuring each row on every change.
         # Filename
         renderer_text = Gtk.CellRendererText()
         renderer_text.set_padding(12, 8)
+        renderer_text.set_property("ellipsize", 3)  # PANGO_ELLIPSIZE_END
         col = Gtk.TreeViewColumn("File", renderer_text, text=self.COL_FILENAME)
         col.set_sort_column_id(self.COL_FILENAME)
         col.set_resizable(True)
         col.set_min_width(200)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(260)
         self.view.append_column(col)
 
         # Progress
@@ -556,14 +1022,19 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         col = Gtk.TreeViewColumn("Progress", renderer_prog, value=self.COL_PROGRESS, text=self.COL_STATUS)
         col.set_resizable(True)
         col.set_min_width(150)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(150)
         self.view.append_column(col)
 
         # Status
         renderer_text = Gtk.CellRendererText()
         renderer_text.set_padding(12, 8)
+        renderer_text.set_property("ellipsize", 3)  # PANGO_ELLIPSIZE_END
         col = Gtk.TreeViewColumn("Status", renderer_text, text=self.COL_STATUS)
         col.set_resizable(True)
         col.set_min_width(120)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(160)
         self.view.append_column(col)
 
         # Speed
@@ -572,6 +1043,8 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         col = Gtk.TreeViewColumn("Speed", renderer_text, text=self.COL_SPEED)
         col.set_resizable(True)
         col.set_min_width(100)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(100)
         self.view.append_column(col)
 
         # ETA
@@ -580,6 +1053,8 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         col = Gtk.TreeViewColumn("ETA", renderer_text, text=self.COL_ETA)
         col.set_resizable(True)
         col.set_min_width(80)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(90)
         self.view.append_column(col)
 
         # URL
@@ -589,7 +1064,11 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         col = Gtk.TreeViewColumn("URL", renderer_text, text=self.COL_URL)
         col.set_resizable(True)
         col.set_min_width(200)
+        col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        col.set_fixed_width(200)
+        col.set_expand(True)
         self.view.append_column(col)
+        self.view.set_fixed_height_mode(True)
 
         # Scrollable container
         scroll = Gtk.ScrolledWindow()
@@ -828,7 +1307,7 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
     def start_http_server(self):
         """Start HTTP server for Chrome extension communication"""
         try:
-            self.http_server = HTTPServer(('localhost', 8080), create_http_handler(self))
+            self.http_server = PooledHTTPServer(('localhost', 8080), create_http_handler(self))
             self.http_thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
             self.http_thread.start()
             print("HTTP server started on localhost:8080 for Chrome extension")
@@ -858,7 +1337,7 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
             new_path = dialog.get_values()
             if new_path:
                 # Expand user path and validate
-                expanded_path = os.path.expanduser(new_path)
+                expanded_path = expand_path(new_path)
                 if os.path.exists(expanded_path) and os.path.isdir(expanded_path):
                     self.config_manager.set("default_download_path", expanded_path)
                 else:
@@ -871,22 +1350,22 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
                         text="Invalid Directory",
                         secondary_text=f"The directory '{expanded_path}' does not exist or is not accessible."
                     )
-                    error_dialog.run()
-                    error_dialog.destroy()
+                    # GTK 4 has no Dialog.run(); close on response without a nested main loop
+                    error_dialog.connect("response", lambda d, r: d.destroy())
+                    error_dialog.show()
         dialog.destroy()
 
+    def items(self) -> list:
+        """Snapshot of the listed downloads, safe to iterate while rows change"""
+        return [row[self.COL_OBJ] for row in self.store]
+
     def on_start_all(self, *_):
-        for row in self.store:
-            item: DownloadItem = row[self.COL_OBJ]
-            if item and not item.is_active() and (
-                item.status in ("Queued", "Paused") or 
-                item.status.startswith(("Connection error:", "Timeout error:", "Request error:", "HTTP error:", "Error:"))
-            ):
+        for item in self.items():
+            if item and not item.is_active() and item.is_retryable():
                 item.start()
 
     def on_pause_all(self, *_):
-        for row in self.store:
-            item: DownloadItem = row[self.COL_OBJ]
+        for item in self.items():
             if item and item.is_active():
                 item.pause()
 
@@ -898,7 +1377,11 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
             if item and item.is_active():
                 item.pause()
             # Do not delete files; only remove from list. Partial file remains for possible resume.
+            if item:
+                self._rows.pop(item.id, None)
             self.store.remove(treeiter)
+            # The pump recounts only on state changes; a removal is not one
+            self.update_stats_display()
 
     def on_row_activated(self, view, path, column):  # toggle start/pause on double-click
         treeiter = self.store.get_iter(path)
@@ -910,13 +1393,126 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         else:
             item.start()
 
+    # --------- Scheduling ---------
+    def schedule(self, item: DownloadItem):
+        """Queue an item; it starts as soon as a download slot is free"""
+        with self._sched_lock:
+            if not item._queued:
+                item._queued = True
+                self._pending.append(item)
+        self.mark_stats_dirty()
+        self._fill_slots()
+        with self._sched_lock:
+            # Still queued: every slot is busy. Checked under the lock so a
+            # worker that just picked the item up keeps its own status.
+            if item._queued:
+                item.status = "Waiting for slot..."
+                self.mark_dirty(item)
+
+    def unschedule(self, item: DownloadItem) -> bool:
+        """Drop an item that is still waiting for a slot"""
+        with self._sched_lock:
+            if not item._queued:
+                return False
+            self._pending.remove(item)
+            item._queued = False
+        self.mark_stats_dirty()
+        return True
+
+    def _fill_slots(self):
+        with self._sched_lock:
+            while self._pending and len(self._running) < self._k:
+                item = self._pending.popleft()
+                self._running.add(item)
+                item._future = self.pool.submit(self._run_item, item)
+                # Runs once is_active() turns False, so the counts come out right
+                item._future.add_done_callback(lambda _: self.mark_stats_dirty())
+                item._queued = False
+            if self._running and not self._tune_id:
+                self._tune_id = GLib.timeout_add_seconds(5, self._tune_concurrency)
+
+    def _run_item(self, item: DownloadItem):
+        try:
+            item._worker()
+        finally:
+            with self._sched_lock:
+                self._running.discard(item)
+            self._fill_slots()
+
+    def _tune_concurrency(self):
+        """Grow the slot count while each slot keeps its throughput, shrink when the total drops"""
+        with self._sched_lock:
+            if not self._running and not self._pending:
+                self._tune_id = 0
+                return False
+            running = frozenset(self._running)
+            saturated = bool(self._pending) and len(running) >= self._k
+        # A handoff, or an item that has not measured its speed yet, reads as a
+        # drop; only judge ticks where the same items ran the whole interval
+        settled = bool(running) and running == self._tune_seen and all(item._speed_seeded for item in running)
+        self._tune_seen = running
+        if settled and saturated:
+            throughput = sum(item.speed_bps for item in running)
+            per_slot = throughput / len(running)
+            k = self._k
+            if throughput < self._last_throughput * 0.9 and k > 1:
+                self._k -= 1
+            elif throughput and per_slot >= self._last_per_slot * 0.9 and k < self._k_max:
+                self._k += 1
+            if self._k != k or not self._last_throughput:
+                self._last_throughput = throughput
+                self._last_per_slot = per_slot
+        self._fill_slots()
+        return True
+
+    # --------- UI pump ---------
+    def mark_dirty(self, item: DownloadItem):
+        """Flag an item for repaint on the next UI tick; safe from any thread"""
+        with self._dirty_lock:
+            self._dirty.add(item)
+            self._wake_pump()
+
+    def mark_stats_dirty(self):
+        """Recount the stats header on the next UI tick; safe from any thread"""
+        with self._dirty_lock:
+            self._stats_dirty = True
+            self._wake_pump()
+
+    def _wake_pump(self):
+        # Caller holds _dirty_lock. While the window is unmapped nothing is
+        # painted, so the timer stays off until "map" brings it back.
+        if not self._pump_id and self._mapped:
+            self._pump_id = GLib.timeout_add(200, self._pump_ui)
+
+    def _on_map(self, *_):
+        with self._dirty_lock:
+            self._mapped = True
+            if self._dirty or self._stats_dirty or self._running:
+                self._wake_pump()
+
+    def _on_unmap(self, *_):
+        with self._dirty_lock:
+            # The pump sees this on its next tick and stops; dirty items wait for "map"
+            self._mapped = False
+
+    def _pump_ui(self):
+        with self._dirty_lock:
+            if not self._mapped or not (self._dirty or self._stats_dirty or self._running):
+                # Hidden, or nothing downloading and nothing to paint: let the main loop sleep
+                self._pump_id = 0
+                return False
+            dirty, self._dirty = self._dirty, set()
+            stats, self._stats_dirty = self._stats_dirty, False
+        for item in dirty:
+            self.refresh_row(item)
+        # One O(rows) recount per tick at most, and only when a count can have moved
+        if stats:
+            self.update_stats_display()
+        return True
+
     # --------- Data ops ---------
     def add_download(self, url: str, dest_path: str):
-        item = DownloadItem(url=url, dest_path=dest_path, app_ref=self)
-        progress = 0
-        speed = "0 B/s"
-        eta = "--"
-        self.store.append([item.filename, progress, item.status, speed, eta, url, item])
+        item = self._append_item(url, dest_path)
         
         # Update stats display
         self.update_stats_display()
@@ -924,31 +1520,94 @@ class DownloadManagerApp(Gtk.ApplicationWindow):
         # Automatically start the download
         item.start()
 
-    def refresh_row(self, item: DownloadItem):
-        # Find row by object
-        for row in self.store:
-            if row[self.COL_OBJ] is item:
-                # Compute progress percentage
-                if item.total_size and item.total_size > 0:
-                    pct = int((item.downloaded / item.total_size) * 100)
-                    pct = max(0, min(100, pct))
-                else:
-                    pct = 0
-
-                speed = f"{human_size(item.speed_bps)}/s" if item.speed_bps else "0 B/s"
-                eta = human_time(item.eta_seconds)
-
-                row[self.COL_FILENAME] = item.filename
-                row[self.COL_PROGRESS] = pct
-                row[self.COL_STATUS] = item.status
-                row[self.COL_SPEED] = speed
-                row[self.COL_ETA] = eta
-                row[self.COL_URL] = item.url
-                break
-        
-        # Update stats display
+    def _append_item(self, url: str, dest_path: str) -> DownloadItem:
+        item = DownloadItem(url=url, dest_path=dest_path, app_ref=self)
+        progress = 0
+        speed = "0 B/s"
+        eta = "--"
+        treeiter = self.store.append([item.filename, progress, item.status, speed, eta, url, item])
+        self._rows[item.id] = treeiter
+        item._last_ui = (progress, item.status, speed, eta)
+        return item
+
+    def queue_download(self, url: str, dest_path: str):
+        """Add a download from any thread; rows are inserted in batches on the UI thread"""
+        with self._ingress_lock:
+            self._ingress.append((url, dest_path))
+            if not self._ingress_id:
+                self._ingress_id = GLib.timeout_add(150, self._drain_ingress)
+
+    def _drain_ingress(self):
+        with self._ingress_lock:
+            batch, self._ingress = self._ingress[:64], self._ingress[64:]
+            more = bool(self._ingress)
+            if not more:
+                self._ingress_id = 0
+
+        # A large batch is cheaper to insert with the view detached
+        detach = len(batch) >= 16
+        if detach:
+            self.freeze_view()
+        items = [self._append_item(url, dest_path) for url, dest_path in batch]
+        if detach:
+            self.thaw_view()
         self.update_stats_display()
-        return False
+        for item in items:
+            item.start()
+        return more
+
+    def freeze_view(self):
+        """Detach the model for a bulk change; the view relayouts once on thaw_view()"""
+        self._frozen += 1
+        if self._frozen == 1:
+            _, selected = self.view.get_selection().get_selected()
+            self._frozen_state = (selected, self.view.get_vadjustment().get_value())
+            self.view.set_model(None)
+
+    def thaw_view(self):
+        """Reattach the model and restore the selection and scroll position"""
+        self._frozen -= 1
+        if self._frozen == 0:
+            selected, scroll = self._frozen_state
+            self._frozen_state = (None, 0.0)
+            self.view.set_model(self.store)
+            if selected is not None:
+                self.view.get_selection().select_iter(selected)
+            # The adjustment's range is only rebuilt by the next layout pass
+            GLib.idle_add(self.view.get_vadjustment().set_value, scroll)
+
+    def refresh_row(self, item: DownloadItem):
+        # The view runs in fixed-height mode: live columns must stay single-line
+        # O(1) row lookup; removed items are no longer in the index
+        treeiter = self._rows.get(item.id)
+        if treeiter is not None:
+            # Compute progress percentage
+            if item.total_size and item.total_size > 0:
+                pct = int((item.downloaded / item.total_size) * 100)
+                pct = max(0, min(100, pct))
+            else:
+                pct = 0
+
+            # Reformat only when the displayed value moves
+            kib = round(item.speed_bps / 1024)
+            if kib != item._speed_str[0]:
+                item._speed_str = (kib, f"{human_size(kib * 1024)}/s" if kib else "0 B/s")
+            speed = item._speed_str[1]
+            secs = None if item.eta_seconds is None else int(item.eta_seconds)
+            if secs != item._eta_str[0]:
+                item._eta_str = (secs, human_time(secs))
+            eta = item._eta_str[1]
+
+            # Write only the columns that differ, in one batched set()
+            shown = (pct, item.status, speed, eta)
+            last = item._last_ui or (None,) * len(shown)
+            changed = []
+            for col, value, old in zip(self.LIVE_COLS, shown, last):
+                if value != old:
+                    changed += (col, value)
+            if changed:
+                self.store.set(treeiter, *changed)
+                item._last_ui = shown
 
 
 class AddDownloadDialog(Gtk.Dialog):
@@ -986,9 +1645,12 @@ class AddDownloadDialog(Gtk.Dialog):
         self.dest_label.set_ellipsize(3)  # PANGO_ELLIPSIZE_END
         self.dest_path: Optional[str] = None
         
+        # Resolve and check the default folder once for the dialog's lifetime
+        self._default_dir = expand_path(self.config_manager.get("default_download_path", "~/Downloads"))
+        self._default_is_dir = os.path.isdir(self._default_dir)
+
         # Initialize with default path
-        default_path = self.config_manager.get("default_download_path", "~/Downloads")
-        self.dest_path = os.path.expanduser(default_path)
+        self.dest_path = self._default_dir
         self.dest_label.set_text(self.dest_path)
 
         grid.attach(lbl_url, 0, 0, 1, 1)
@@ -999,8 +1661,7 @@ class AddDownloadDialog(Gtk.Dialog):
 
     def on_use_default(self, *_):
         # Reset to default path
-        default_path = self.config_manager.get("default_download_path", "~/Downloads")
-        self.dest_path = os.path.expanduser(default_path)
+        self.dest_path = self._default_dir
         self.dest_label.set_text(self.dest_path)
 
     def on_choose_dest(self, *_):
@@ -1008,7 +1669,7 @@ class AddDownloadDialog(Gtk.Dialog):
         guessed = None
         url_text = self.entry_url.get_text().strip()
         if url_text:
-            guessed = os.path.basename(url_text.split("?")[0].split("#")[0]) or "download.bin"
+            guessed = guess_filename(url_text)
         
         dialog = Gtk.FileChooserDialog(
             title="Save As",
@@ -1019,10 +1680,8 @@ class AddDownloadDialog(Gtk.Dialog):
         dialog.add_button("_Save", Gtk.ResponseType.OK)
         
         # Start from default directory
-        default_path = self.config_manager.get("default_download_path", "~/Downloads")
-        expanded_default = os.path.expanduser(default_path)
-        if os.path.exists(expanded_default):
-            dialog.set_current_folder(expanded_default)
+        if self._default_is_dir:
+            dialog.set_current_folder(self._default_dir)
         
         if guessed:
             dialog.set_current_name(guessed)
@@ -1044,8 +1703,12 @@ class AddDownloadDialog(Gtk.Dialog):
             return "", ""
         
         # If dest_path is just a directory, append filename from URL
-        if self.dest_path and os.path.isdir(self.dest_path):
-            filename = os.path.basename(url.split("?")[0].split("#")[0]) or "download.bin"
+        if self.dest_path == self._default_dir:
+            is_dir = self._default_is_dir
+        else:
+            is_dir = bool(self.dest_path) and os.path.isdir(self.dest_path)
+        if is_dir:
+            filename = guess_filename(url)
             full_path = os.path.join(self.dest_path, filename)
         else:
             full_path = self.dest_path or ""
@@ -1100,8 +1763,8 @@ class SettingsDialog(Gtk.Dialog):
         
         # Set current path if it exists
         current_path = self.entry_path.get_text().strip()
-        if current_path and os.path.exists(os.path.expanduser(current_path)):
-            dialog.set_current_folder(os.path.expanduser(current_path))
+        if current_path and os.path.exists(expand_path(current_path)):
+            dialog.set_current_folder(expand_path(current_path))
         
         dialog.connect("response", self.on_folder_chooser_response)
         dialog.show()
@@ -1130,18 +1793,50 @@ class DownloadManagerApplication(Gtk.Application):
         self.win.present()
     
     def on_shutdown(self, app):
+        # Stop taking extension requests first, so nothing new is queued while
+        # downloads are being paused; the server may never have started
+        http_server = getattr(getattr(self, 'win', None), 'http_server', None)
+        if http_server is not None:
+            http_server.shutdown()
+            http_server.server_close()
         # Try to stop active downloads gracefully
         if hasattr(self, 'win') and self.win.store:
-            for row in list(self.win.store):
-                item: DownloadItem = row[self.win.COL_OBJ]
+            futures = []
+            for item in self.win.items():
                 if item and item.is_active():
+                    # pause() only flags the worker, so this loop never blocks
                     item.pause()
+                    if item._future is not None:
+                        futures.append(item._future)
+            # Give workers a bounded moment to reach a chunk boundary and save
+            # their resume state
+            wait(futures, timeout=2.0)
+            # Interpreter exit joins the pool threads, so a worker still blocked
+            # in a read would hold it for the whole read timeout; break its socket
+            for item in self.win.items():
+                if item:
+                    item.abort_io()
+        if hasattr(self, 'win'):
+            self.win.config_manager.flush()
+            # Paused workers leave at their next chunk; drop anything not yet started
+            self.win.pool.shutdown(wait=False, cancel_futures=True)
+            self.win.segment_pool.shutdown(wait=False, cancel_futures=True)
+            # Closes idle pooled sockets; connections still in use finish normally
+            self.win.session.close()
+
+    def on_sigint(self):
+        # Quit through "shutdown" so workers stop at a chunk boundary and keep
+        # their .part files resumable; a second Ctrl+C exits immediately
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        self.quit()
+        return False
 
 def main():
-    # Handle Ctrl+C
-    signal.signal(signal.SIGINT, signal.SIG_DFL)
-
     app = DownloadManagerApplication()
+
+    # Handle Ctrl+C on the main loop instead of killing the process mid-write
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, app.on_sigint)
+
     return app.run(sys.argv)
 
 